@@ -32,7 +32,6 @@ bl_info = {
     "category": "Development",
 }
 
-import pickle
 import uuid
 
 import bpy
@@ -54,6 +53,7 @@ from . import export_jbeam
 from . import import_vehicle
 from . import export_vehicle
 from . import text_editor
+from . import utils
 
 if not constants.UNIT_TESTING:
     import gpu
@@ -616,10 +616,11 @@ def refresh_curr_vdata(force_refresh=False):
             collection = obj.users_collection[0]
             veh_model = collection.get(constants.COLLECTION_VEHICLE_MODEL)
 
+            # Shared through the unpickle cache, read only
             if veh_model is not None:
-                curr_vdata = pickle.loads(collection[constants.COLLECTION_VEHICLE_BUNDLE])['vdata']
+                curr_vdata = utils.cached_pickle_loads((constants.COLLECTION_VEHICLE_BUNDLE, collection.name), collection[constants.COLLECTION_VEHICLE_BUNDLE])['vdata']
             else:
-                curr_vdata = pickle.loads(obj_data[constants.MESH_SINGLE_JBEAM_PART_DATA])
+                curr_vdata = utils.cached_pickle_loads((constants.MESH_SINGLE_JBEAM_PART_DATA, obj_data.name), obj_data[constants.MESH_SINGLE_JBEAM_PART_DATA])
         else:
             curr_vdata = None
 
@@ -1048,7 +1049,7 @@ def poll_active_operators():
                     export_vehicle.auto_export(active_obj.name, veh_model)
                 else:
                     # Export
-                    export_jbeam.auto_export(active_obj.name)
+                    export_jbeam.auto_export(active_obj.name, _force_do_export)
 
                 refresh_curr_vdata(True)
 
@@ -1065,6 +1066,12 @@ def save_post_callback(filepath):
     export_jbeam.save_post_callback(filepath)
 
 
+@persistent
+def load_post_callback(filepath):
+    # Cached data of the previous file's datablocks is never used again
+    utils.clear_pickle_loads_cache()
+
+
 @persistent
 def on_post_register():
     # this will happen 0.1 seconds after addon registration completes.
@@ -1132,6 +1139,7 @@ def register():
 
     bpy.app.handlers.depsgraph_update_post.append(depsgraph_callback)
     bpy.app.handlers.save_post.append(save_post_callback)
+    bpy.app.handlers.load_post.append(load_post_callback)
 
     # Delayed function call to prevent "restrictcontext" error
     bpy.app.timers.register(on_post_register, first_interval=0.1, persistent=True)
@@ -1157,6 +1165,7 @@ def unregister():
 
     bpy.app.handlers.depsgraph_update_post.remove(depsgraph_callback)
     bpy.app.handlers.save_post.remove(save_post_callback)
+    bpy.app.handlers.load_post.remove(load_post_callback)
 
     if draw_handle:
         bpy.types.SpaceView3D.draw_handler_remove(draw_handle, 'WINDOW')
@@ -20,6 +20,7 @@
 
 UNIT_TESTING = False
 DEBUG = False
+DEBUG_TIMING = False
 
 # JBeam Collection Attributes
 COLLECTION_IO_CTX = 'collection_vehicle_io_ctx'
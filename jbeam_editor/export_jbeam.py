@@ -18,7 +18,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import pickle
+import hashlib
+from operator import itemgetter
 import traceback
 import sys
 
@@ -27,6 +28,7 @@ import bpy
 from bpy.types import Operator
 
 import bmesh
+import numpy as np
 
 from . import constants
 from . import utils
@@ -36,82 +38,90 @@ from . import sjsonast
 
 import timeit
 
+# Per part: 'hash' is the export state hash of the part if its last export didn't change anything
 last_exported_jbeams = {}
 
+# AST nodes of the JBeam files on disk, with the hash of the file content they were parsed from
+_disk_ast_nodes_cache = {}
+
 
 def save_post_callback(filepath):
     # On saving, set the JBeam part meshes import file paths to what is saved in the Python environment filepath
-    for obj in bpy.context.scene.objects:
+    jbeam_objs = bpy.data.collections.get('JBeam Objects')
+    if jbeam_objs is None:
+        return
+    # The collection can also hold objects of other scenes and linked libraries (read only), only update the ones of this scene
+    scene_objs = bpy.context.scene.objects
+    for obj in jbeam_objs.all_objects:
         obj_data = obj.data
+        if obj_data.library is not None or scene_objs.get(obj.name) != obj:
+            continue
         jbeam_part = obj_data.get(constants.MESH_JBEAM_PART)
         if jbeam_part == None:
             continue
 
-        bm = None
-        if obj.mode == 'EDIT':
-            bm = bmesh.from_edit_mesh(obj_data)
-        else:
-            bm = bmesh.new()
-            bm.from_mesh(obj_data)
-
-        if jbeam_part in last_exported_jbeams:
-            obj_data[constants.MESH_JBEAM_FILE_PATH] = last_exported_jbeams[jbeam_part]['in_filepath']
-
-        bm.free()
+        in_filepath = last_exported_jbeams.get(jbeam_part, {}).get('in_filepath')
+        if in_filepath is not None:
+            obj_data[constants.MESH_JBEAM_FILE_PATH] = in_filepath
 
 def export_new_jbeam(context, obj, obj_data, bm, init_node_id_layer, node_id_layer, filepath):
-    node_names = []
-    longest_node_name = 0
-    longest_x = 0
-    longest_y = 0
-    pos_strs = []
-    abs_pos_strs = []
-
-    bm.verts.ensure_lookup_table()
-    for i in range(len(bm.verts)):
-        v = bm.verts[i]
-        node_id = v[node_id_layer].decode('utf-8')
-        pos_str = (to_float_str(v.co.x), to_float_str(v.co.y), to_float_str(v.co.z))
-        abs_pos_str = (pos_str[0].replace('-','',1), pos_str[1].replace('-','',1), pos_str[2].replace('-','',1))
-        pos_strs.append(pos_str)
-        abs_pos_strs.append(abs_pos_str)
-
-        longest_node_name = max(longest_node_name, len(node_id))
-        longest_x = max(longest_x, len(abs_pos_str[0]))
-        longest_y = max(longest_y, len(abs_pos_str[1]))
-        node_names.append(node_id)
-
-    nodes = ['["id", "posX", "posY", "posZ"]']
-
-    for i in range(len(bm.verts)):
-        v = bm.verts[i]
-        node_id = v[node_id_layer].decode('utf-8')
-        pos_str = pos_strs[i]
-        abs_pos_str = abs_pos_strs[i]
-
-        x_space = ((pos_str[0][0] != '-' and 1 or 0) + longest_node_name - len(node_id)) * ' '
-        y_space = ((pos_str[1][0] != '-' and 1 or 0) + longest_x - len(abs_pos_str[0])) * ' '
-        z_space = ((pos_str[2][0] != '-' and 1 or 0) + longest_y - len(abs_pos_str[1])) * ' '
-
-        nodes.append('["{}",{} {},{} {},{} {}]'.format(node_id, x_space, pos_str[0], y_space, pos_str[1], z_space, pos_str[2]))
-
-    str_jbeam_data = '{\n"' + obj.name + '": {\n    "nodes": [\n        '
-    str_jbeam_data += ',\n        '.join(nodes)
-    str_jbeam_data += '\n    ],\n},\n}'
+    # Gather all vertex positions at once instead of reading them per vertex
+    coords = utils.get_vertex_positions(obj, bm)
+
+    node_ids = [v[node_id_layer].decode('utf-8') for v in bm.verts]
+
+    # Format all positions and measure their widths in one go
+    pos_strs = utils.to_float_str_array(coords)
+    negatives = np.signbit(coords) # also true for -0.0, which is formatted with a minus sign
+    abs_pos_str_lens = np.char.str_len(pos_strs) - negatives
+    node_id_lens = np.fromiter(map(len, node_ids), dtype=np.int64, count=len(node_ids))
+    longest_node_name = node_id_lens.max(initial=0)
+    longest_xy = abs_pos_str_lens[:, :2].max(axis=0, initial=0)
+
+    # Column alignment padding before each coordinate (positive numbers get an extra space for the missing minus sign)
+    paddings = (~negatives).astype(np.int64)
+    paddings[:, 0] += longest_node_name - node_id_lens
+    paddings[:, 1:] += longest_xy - abs_pos_str_lens[:, :2]
+    spaces = np.char.multiply(' ', paddings).tolist() if len(node_ids) > 0 else []
+    pos_strs = pos_strs.tolist()
 
     #str_jbeam_data = sjson.dumps(jbeam_data, '  ')
     #str_jbeam_data = sjson.dumps(sjson.loads(context.scene['jbeam_file_str_data']), '  ')
 
-    f = open(filepath, 'w', encoding='utf-8')
-    f.write(str_jbeam_data)
-    f.close()
+    # Stream node lines to the file instead of building the whole file text in memory first
+    def iter_chunks():
+        yield '{\n"'
+        yield obj.name
+        yield '": {\n    "nodes": [\n        '
+        yield '["id", "posX", "posY", "posZ"]'
+
+        for node_id, pos_str, space in zip(node_ids, pos_strs, spaces):
+            yield ',\n        '
+            yield f'["{node_id}",{space[0]} {pos_str[0]},{space[1]} {pos_str[1]},{space[2]} {pos_str[2]}]'
+
+        yield '\n    ],\n},\n}'
+
+    if not utils.write_file_chunks(filepath, iter_chunks()):
+        return
 
     obj_data[constants.MESH_JBEAM_FILE_PATH] = filepath
 
 
-def export_existing_jbeam(obj: bpy.types.Object):
+def get_export_state_hash(obj: bpy.types.Object, bm: bmesh.types.BMesh, jbeam_filepath: str, part_data_blob: bytes, affect_node_references: bool):
+    """hashes the node positions and ids of the part mesh"""
+    # Only meant to be cheap enough for every auto export. Layer only edits (renames, face flips, added faces) always force an export instead.
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((jbeam_filepath, affect_node_references, len(part_data_blob), len(bm.verts), len(bm.edges), len(bm.faces))).encode('utf-8'))
+    h.update(np.array(obj.matrix_world, dtype=np.float32).tobytes())
+    h.update(utils.get_vertex_positions(obj, bm).tobytes())
+    h.update(b'\0'.join(map(itemgetter(bm.verts.layers.string[constants.VL_NODE_ID]), bm.verts)))
+    return h.digest()
+
+
+def export_existing_jbeam(obj: bpy.types.Object, force: bool = False):
     try:
-        t0 = timeit.default_timer()
+        if constants.DEBUG_TIMING:
+            t0 = timeit.default_timer()
         context = bpy.context
         scene = context.scene
         ui_props = scene.ui_properties
@@ -120,7 +130,9 @@ def export_existing_jbeam(obj: bpy.types.Object):
 
         jbeam_filepath = obj_data[constants.MESH_JBEAM_FILE_PATH]
         part_name = obj_data[constants.MESH_JBEAM_PART]
-        part_data = pickle.loads(obj_data[constants.MESH_SINGLE_JBEAM_PART_DATA])
+        part_data_blob = obj_data[constants.MESH_SINGLE_JBEAM_PART_DATA]
+        # Shared through the unpickle cache, read only
+        part_data = utils.cached_pickle_loads((constants.MESH_SINGLE_JBEAM_PART_DATA, obj_data.name), part_data_blob)
         init_nodes_data = part_data.get('nodes')
 
         bm = None
@@ -130,12 +142,26 @@ def export_existing_jbeam(obj: bpy.types.Object):
             bm = bmesh.new()
             bm.from_mesh(obj_data)
 
-        blender_nodes, parts_nodes_actions = export_utils.get_nodes_add_delete_rename(obj, bm, part_name, init_nodes_data, affect_node_references)
-        parts_to_update = set(parts_nodes_actions.keys())
-        bm.free()
+        # The JBeam file doesn't need updating if the part is in the same state as when it last exported without changes
+        export_state = last_exported_jbeams.setdefault(part_name, {})
+        export_hash = get_export_state_hash(obj, bm, jbeam_filepath, part_data_blob, affect_node_references)
+        reimport_needed = False
+        nodes_to_move = {}
+
+        if not force and export_state.get('hash') == export_hash:
+            bm.free()
+        else:
+            export_state.pop('hash', None)
+            blender_nodes, parts_nodes_actions = export_utils.get_nodes_add_delete_rename(obj, bm, part_name, init_nodes_data, affect_node_references)
+            parts_to_update = set(parts_nodes_actions.keys())
+            bm.free()
+
+            reimport_needed = export_utils.export_file(jbeam_filepath, [obj], part_data, blender_nodes, parts_nodes_actions, affect_node_references, parts_to_update)
+            text_editor.check_int_files_for_changes(context, [jbeam_filepath], regenerate_mesh=reimport_needed)
 
-        reimport_needed = export_utils.export_file(jbeam_filepath, [obj], part_data, blender_nodes, parts_nodes_actions, affect_node_references, parts_to_update)
-        text_editor.check_int_files_for_changes(context, [jbeam_filepath], regenerate_mesh=reimport_needed)
+            nodes_to_move = parts_nodes_actions[part_name].nodes_to_move
+            if not reimport_needed and not any(part_actions.nodes_to_move for part_actions in parts_nodes_actions.values()):
+                export_state['hash'] = export_hash
 
         # Make sure node positions are all synced if not reimporting
         if not reimport_needed:
@@ -145,7 +171,6 @@ def export_existing_jbeam(obj: bpy.types.Object):
                 bm = bmesh.new()
                 bm.from_mesh(obj_data)
 
-            nodes_to_move = parts_nodes_actions[part_name].nodes_to_move
 
             node_id_layer = bm.verts.layers.string[constants.VL_NODE_ID]
             v: bmesh.types.BMVert
@@ -163,21 +188,22 @@ def export_existing_jbeam(obj: bpy.types.Object):
 
         bpy.ops.object.location_clear()
 
-        t1 = timeit.default_timer()
-        print('Exporting/reimporting Time', round(t1 - t0, 2), 's')
+        if constants.DEBUG_TIMING:
+            t1 = timeit.default_timer()
+            print('Exporting/reimporting Time', round(t1 - t0, 2), 's')
 
     except:
         traceback.print_exc()
 
 
-def auto_export(obj_name: str):
+def auto_export(obj_name: str, force: bool = False):
     jbeam_objs: bpy.types.Collection | None = bpy.data.collections.get('JBeam Objects')
     if jbeam_objs is None:
         return
     obj: bpy.types.Object | None = jbeam_objs.all_objects.get(obj_name)
     if obj is None:
         return
-    export_existing_jbeam(obj)
+    export_existing_jbeam(obj, force)
 
 
 def go_up_level(stack: list):
@@ -267,33 +293,68 @@ def get_part_in_ast_nodes(ast_nodes, jbeam_part):
     return start_pos, end_pos
 
 
+def get_text_hash(text: str):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def iter_hashed_chunks(chunks, hasher):
+    # Hashes the chunks as they're written out, so the written text doesn't have to be built up just to hash it
+    for chunk in chunks:
+        hasher.update(chunk.encode('utf-8'))
+        yield chunk
+
+
+def get_disk_ast_nodes(filepath: str):
+    external_text = utils.read_file(filepath)
+    if external_text is None:
+        return None
+
+    # Only parse the file on disk again if its content changed since it was last parsed or written
+    text_hash = get_text_hash(external_text)
+    cached = _disk_ast_nodes_cache.get(filepath)
+    if cached is not None and cached[0] == text_hash:
+        return list(cached[1])
+
+    external_ast_data = sjsonast.parse(external_text)
+    external_ast_nodes: list = external_ast_data['ast']['nodes']
+    _disk_ast_nodes_cache[filepath] = (text_hash, list(external_ast_nodes))
+    return external_ast_nodes
+
+
 # Export the specific part from the Blender text editor to the disk
 # Only replaces the lines of text related to the specific part
 def export_to_disk(jbeam_part, jbeam_filepath):
     internal_text = text_editor.read_int_file(jbeam_filepath)
     if internal_text is None:
         return False
-    external_text = utils.read_file(jbeam_filepath)
-    if external_text is None:
+    external_ast_nodes = get_disk_ast_nodes(jbeam_filepath)
+    if external_ast_nodes is None:
         return False
 
     internal_ast_data = sjsonast.parse(internal_text)
     internal_ast_nodes: dict = internal_ast_data['ast']['nodes']
 
-    external_ast_data = sjsonast.parse(external_text)
-    external_ast_nodes: dict = external_ast_data['ast']['nodes']
-
     internal_start_pos, internal_end_pos = get_part_in_ast_nodes(internal_ast_nodes, jbeam_part)
     external_start_pos, external_end_pos = get_part_in_ast_nodes(external_ast_nodes, jbeam_part)
 
-    external_ast_nodes[external_start_pos : external_end_pos + 1] = internal_ast_nodes[internal_start_pos : internal_end_pos + 1]
+    internal_part_nodes = internal_ast_nodes[internal_start_pos : internal_end_pos + 1]
 
-    output_text = sjsonast.stringify_nodes(external_ast_nodes)
+    # Nothing to write if the part on disk is already the same (the rest of the file is kept from disk)
+    if sjsonast.stringify_nodes(internal_part_nodes) == sjsonast.stringify_nodes(external_ast_nodes[external_start_pos : external_end_pos + 1]):
+        return True
 
-    res = utils.write_file(jbeam_filepath, output_text)
+    external_ast_nodes[external_start_pos : external_end_pos + 1] = internal_part_nodes
+
+    # Stream the file out instead of building its whole text first
+    hasher = hashlib.blake2b(digest_size=16)
+    res = utils.write_file_chunks(jbeam_filepath, iter_hashed_chunks(sjsonast.iter_stringify_nodes(external_ast_nodes), hasher))
     if not res:
+        _disk_ast_nodes_cache.pop(jbeam_filepath, None)
         return False
 
+    # The nodes just written are what's on disk now
+    _disk_ast_nodes_cache[jbeam_filepath] = (hasher.digest(), external_ast_nodes)
+
     return True
 
 
@@ -18,6 +18,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from collections import defaultdict
 from mathutils import Vector
 import sys
 import traceback
@@ -25,10 +26,11 @@ import traceback
 import bpy
 
 import bmesh
+import numpy as np
 
 from . import constants
 from .sjsonast import ASTNode, parse as sjsonast_parse, stringify_nodes as sjsonast_stringify_nodes
-from .utils import Metadata, is_number, to_c_float, to_float_str, get_float_precision
+from .utils import Metadata, is_number, to_c_float, to_float_str, get_float_precision, get_vertex_positions, fast_deepcopy
 from . import text_editor
 
 from .jbeam import io as jbeam_io
@@ -97,22 +99,23 @@ def get_next_non_wsc_node(ast_nodes, start_idx):
     return -1
 
 
-def compare_and_set_value(original_jbeam_file_data, jbeam_file_data, stack, index, node):
-    old_data = original_jbeam_file_data
-    data = jbeam_file_data
-    for stack_entry in stack:
-        old_data = old_data[stack_entry[0]]
-        data = data[stack_entry[0]]
+def get_child_data(data, key):
+    try:
+        return data[key]
+    except (KeyError, IndexError, TypeError):
+        return None
+
 
-    old_data = old_data[index]
-    data = data[index]
+def compare_and_set_value(original_container, container, index, node):
+    old_data = original_container[index]
+    data = container[index]
 
     # Only change value in AST if changed between old and new SJSON data
     if node.data_type == 'number':
-        if is_number(data) and (to_c_float(old_data) != to_c_float(data) and old_data != data):
+        # Compare the raw values first, so unchanged numbers skip the float conversions
+        if is_number(data) and old_data != data and to_c_float(old_data) != to_c_float(data):
             node.value = data
-            fval = float(data)
-            node.precision = min(4, max(len((f'%.4g' % abs(fval - int(fval)))) - 2, 0))
+            node.precision = get_float_precision(data)
             return True
     else:
         if old_data != data:
@@ -134,12 +137,8 @@ def add_jbeam_setup(ast_nodes: list, jbeam_section_start_node_idx: int, jbeam_se
     if node_after_entry.data_type == 'wsc':
         # Split WSC node into one node for inline WSCS node entry and second node after newline character
         wscs = node_after_entry.value
-        nl_found = False
-
-        for k, char in enumerate(wscs):
-            if char == '\n':
-                nl_found = True
-                break
+        k = wscs.find('\n')
+        nl_found = k != -1
 
         node_after_entry.value = wscs[:k] if nl_found else wscs
         node_2_after_entry = ASTNode('wsc', wscs[k:]) if nl_found else None
@@ -160,27 +159,31 @@ def add_jbeam_nodes(ast_nodes: list, jbeam_section_start_node_idx: int, jbeam_se
     i, node_after_entry, node_2_after_entry = add_jbeam_setup(ast_nodes, jbeam_section_start_node_idx, jbeam_section_end_node_idx)
 
     # Insert new nodes at bottom of nodes section
-    nodes = nodes_to_add.items()
-
-    for node_id, node_pos in nodes:
-        if node_after_entry:
-            node_after_entry.value += NL_TWO_INDENT
-            node_after_entry = None
-        else:
-            ast_nodes.insert(i + 0, ASTNode('wsc', NL_TWO_INDENT))
-            i += 1
-
-        ast_nodes.insert(i + 0, ASTNode('['))
-        ast_nodes.insert(i + 1, ASTNode('"', node_id))
-        ast_nodes.insert(i + 2, ASTNode('wsc', ', '))
-        ast_nodes.insert(i + 3, ASTNode('number', node_pos[0], precision=get_float_precision(node_pos[0])))
-        ast_nodes.insert(i + 4, ASTNode('wsc', ', '))
-        ast_nodes.insert(i + 5, ASTNode('number', node_pos[1], precision=get_float_precision(node_pos[1])))
-        ast_nodes.insert(i + 6, ASTNode('wsc', ', '))
-        ast_nodes.insert(i + 7, ASTNode('number', node_pos[2], precision=get_float_precision(node_pos[2])))
-        ast_nodes.insert(i + 8, ASTNode(']'))
-        ast_nodes.insert(i + 9, ASTNode('wsc', ','))
-        i += 10
+    # (entries are built first and spliced in at once, so the rest of the file is only shifted once)
+    new_ast_nodes = []
+    for node_id, node_pos in nodes_to_add.items():
+        pos_x, pos_y, pos_z = node_pos[0], node_pos[1], node_pos[2]
+        new_ast_nodes.extend((
+            ASTNode('wsc', NL_TWO_INDENT),
+            ASTNode('['),
+            ASTNode('"', node_id),
+            ASTNode('wsc', ', '),
+            ASTNode('number', pos_x, precision=get_float_precision(pos_x)),
+            ASTNode('wsc', ', '),
+            ASTNode('number', pos_y, precision=get_float_precision(pos_y)),
+            ASTNode('wsc', ', '),
+            ASTNode('number', pos_z, precision=get_float_precision(pos_z)),
+            ASTNode(']'),
+            ASTNode('wsc', ','),
+        ))
+
+    # First entry goes on the line after the original last entry, in its existing WSCS node
+    if new_ast_nodes:
+        node_after_entry.value += NL_TWO_INDENT
+        del new_ast_nodes[0]
+
+    ast_nodes[i:i] = new_ast_nodes
+    i += len(new_ast_nodes)
 
     # Add modified original last WSCS back to end of section
     if node_2_after_entry:
@@ -195,22 +198,26 @@ def add_jbeam_beams(ast_nodes: list, jbeam_section_start_node_idx: int, jbeam_se
     i, node_after_entry, node_2_after_entry = add_jbeam_setup(ast_nodes, jbeam_section_start_node_idx, jbeam_section_end_node_idx)
 
     # Insert new beams at bottom of beams section
-
+    # (entries are built first and spliced in at once, so the rest of the file is only shifted once)
+    new_ast_nodes = []
     for (node_id_1, node_id_2) in beams_to_add:
-        if node_after_entry:
-            node_after_entry.value += NL_TWO_INDENT
-            node_after_entry = None
-        else:
-            ast_nodes.insert(i + 0, ASTNode('wsc', NL_TWO_INDENT))
-            i += 1
-
-        ast_nodes.insert(i + 0, ASTNode('['))
-        ast_nodes.insert(i + 1, ASTNode('"', node_id_1))
-        ast_nodes.insert(i + 2, ASTNode('wsc', ','))
-        ast_nodes.insert(i + 3, ASTNode('"', node_id_2))
-        ast_nodes.insert(i + 4, ASTNode(']'))
-        ast_nodes.insert(i + 5, ASTNode('wsc', ','))
-        i += 6
+        new_ast_nodes.extend((
+            ASTNode('wsc', NL_TWO_INDENT),
+            ASTNode('['),
+            ASTNode('"', node_id_1),
+            ASTNode('wsc', ','),
+            ASTNode('"', node_id_2),
+            ASTNode(']'),
+            ASTNode('wsc', ','),
+        ))
+
+    # First entry goes on the line after the original last entry, in its existing WSCS node
+    if new_ast_nodes:
+        node_after_entry.value += NL_TWO_INDENT
+        del new_ast_nodes[0]
+
+    ast_nodes[i:i] = new_ast_nodes
+    i += len(new_ast_nodes)
 
     # Add modified original last WSCS back to end of section
     if node_2_after_entry:
@@ -225,24 +232,28 @@ def add_jbeam_triangles(ast_nodes: list, jbeam_section_start_node_idx: int, jbea
     i, node_after_entry, node_2_after_entry = add_jbeam_setup(ast_nodes, jbeam_section_start_node_idx, jbeam_section_end_node_idx)
 
     # Insert new tris at bottom of triangles section
-
+    # (entries are built first and spliced in at once, so the rest of the file is only shifted once)
+    new_ast_nodes = []
     for (node_id_1, node_id_2, node_id_3) in tris_to_add:
-        if node_after_entry:
-            node_after_entry.value += NL_TWO_INDENT
-            node_after_entry = None
-        else:
-            ast_nodes.insert(i + 0, ASTNode('wsc', NL_TWO_INDENT))
-            i += 1
-
-        ast_nodes.insert(i + 0, ASTNode('['))
-        ast_nodes.insert(i + 1, ASTNode('"', node_id_1))
-        ast_nodes.insert(i + 2, ASTNode('wsc', ','))
-        ast_nodes.insert(i + 3, ASTNode('"', node_id_2))
-        ast_nodes.insert(i + 4, ASTNode('wsc', ','))
-        ast_nodes.insert(i + 5, ASTNode('"', node_id_3))
-        ast_nodes.insert(i + 6, ASTNode(']'))
-        ast_nodes.insert(i + 7, ASTNode('wsc', ','))
-        i += 8
+        new_ast_nodes.extend((
+            ASTNode('wsc', NL_TWO_INDENT),
+            ASTNode('['),
+            ASTNode('"', node_id_1),
+            ASTNode('wsc', ','),
+            ASTNode('"', node_id_2),
+            ASTNode('wsc', ','),
+            ASTNode('"', node_id_3),
+            ASTNode(']'),
+            ASTNode('wsc', ','),
+        ))
+
+    # First entry goes on the line after the original last entry, in its existing WSCS node
+    if new_ast_nodes:
+        node_after_entry.value += NL_TWO_INDENT
+        del new_ast_nodes[0]
+
+    ast_nodes[i:i] = new_ast_nodes
+    i += len(new_ast_nodes)
 
     # Add modified original last WSCS back to end of section
     if node_2_after_entry:
@@ -257,26 +268,30 @@ def add_jbeam_quads(ast_nodes: list, jbeam_section_start_node_idx: int, jbeam_se
     i, node_after_entry, node_2_after_entry = add_jbeam_setup(ast_nodes, jbeam_section_start_node_idx, jbeam_section_end_node_idx)
 
     # Insert new quads at bottom of quads section
-
+    # (entries are built first and spliced in at once, so the rest of the file is only shifted once)
+    new_ast_nodes = []
     for (node_id_1, node_id_2, node_id_3, node_id_4) in quads_to_add:
-        if node_after_entry:
-            node_after_entry.value += NL_TWO_INDENT
-            node_after_entry = None
-        else:
-            ast_nodes.insert(i + 0, ASTNode('wsc', NL_TWO_INDENT))
-            i += 1
-
-        ast_nodes.insert(i + 0, ASTNode('['))
-        ast_nodes.insert(i + 1, ASTNode('"', node_id_1))
-        ast_nodes.insert(i + 2, ASTNode('wsc', ','))
-        ast_nodes.insert(i + 3, ASTNode('"', node_id_2))
-        ast_nodes.insert(i + 4, ASTNode('wsc', ','))
-        ast_nodes.insert(i + 5, ASTNode('"', node_id_3))
-        ast_nodes.insert(i + 6, ASTNode('wsc', ','))
-        ast_nodes.insert(i + 7, ASTNode('"', node_id_4))
-        ast_nodes.insert(i + 8, ASTNode(']'))
-        ast_nodes.insert(i + 9, ASTNode('wsc', ','))
-        i += 10
+        new_ast_nodes.extend((
+            ASTNode('wsc', NL_TWO_INDENT),
+            ASTNode('['),
+            ASTNode('"', node_id_1),
+            ASTNode('wsc', ','),
+            ASTNode('"', node_id_2),
+            ASTNode('wsc', ','),
+            ASTNode('"', node_id_3),
+            ASTNode('wsc', ','),
+            ASTNode('"', node_id_4),
+            ASTNode(']'),
+            ASTNode('wsc', ','),
+        ))
+
+    # First entry goes on the line after the original last entry, in its existing WSCS node
+    if new_ast_nodes:
+        node_after_entry.value += NL_TWO_INDENT
+        del new_ast_nodes[0]
+
+    ast_nodes[i:i] = new_ast_nodes
+    i += len(new_ast_nodes)
 
     # Add modified original last WSCS back to end of section
     if node_2_after_entry:
@@ -303,11 +318,11 @@ def delete_jbeam_entry(ast_nodes: list, jbeam_section_start_node_idx: int, jbeam
 
         # If node entry to left, delete right wscs before newline character
         # Else, delete up till newline character
-        for k, char in enumerate(jbeam_entry_next_node.value):
-            if char == '\n':
-                if jbeam_entry_to_left:
-                    k -= 1
-                break
+        k = jbeam_entry_next_node.value.find('\n')
+        if k == -1:
+            k = len(jbeam_entry_next_node.value) - 1
+        elif jbeam_entry_to_left:
+            k -= 1
 
         if k == len(jbeam_entry_next_node.value) - 1:
             del ast_nodes[jbeam_entry_end_node_idx + 1] # next_node
@@ -318,13 +333,7 @@ def delete_jbeam_entry(ast_nodes: list, jbeam_section_start_node_idx: int, jbeam
     if not jbeam_entry_to_left and not jbeam_entry_to_right:
         # Single node entry, delete left indent (not full wsc node)
         wscs = jbeam_entry_prev_node.value
-        wscs_len = len(wscs)
-        for k in range(wscs_len - 1, -1, -1):
-            char = wscs[k]
-            if char == '\n':
-                break
-
-        jbeam_entry_prev_node.value = jbeam_entry_prev_node.value[:k + 1]
+        jbeam_entry_prev_node.value = wscs[:wscs.rfind('\n') + 1]
 
     # Delete the JBeam entry
     del ast_nodes[jbeam_entry_start_node_idx:jbeam_entry_end_node_idx + 1]
@@ -349,13 +358,13 @@ def delete_jbeam_entry(ast_nodes: list, jbeam_section_start_node_idx: int, jbeam
     return i
 
 
-def undo_node_move_offset_and_apply_translation_to_expr(init_node_data: dict, new_pos: Vector):
+def undo_node_move_offset_and_apply_translation_to_expr(init_node_data: dict, new_pos: tuple):
     # Undo node move/offset
     pos_no_offset = Vector(init_node_data['posNoOffset'])
     init_pos = init_node_data['pos']
     metadata = init_node_data[Metadata]
 
-    offset_from_init_pos_tup = (new_pos.x - init_pos[0], new_pos.y - init_pos[1], new_pos.z - init_pos[2])
+    offset_from_init_pos_tup = (new_pos[0] - init_pos[0], new_pos[1] - init_pos[1], new_pos[2] - init_pos[2])
 
     # Apply node translation to expression if expression exists
     pos_expr = (metadata.get('posX', 'expression'), metadata.get('posY', 'expression'), metadata.get('posZ', 'expression'))
@@ -401,18 +410,19 @@ def set_node_renames_positions(jbeam_file_data_modified: dict, jbeam_part: str,
                     continue  # Ignore header row
                 if isinstance(row_data, list):
                     row_node_id = row_data[0]
+                    blender_node = blender_nodes.get(row_node_id)
 
                     # # Ignore if node is defined in a different part.
                     # # Its possible depending on part loading order.
-                    if row_node_id not in blender_nodes or blender_nodes[row_node_id]['partOrigin'] != jbeam_part:
+                    if blender_node is None or blender_node['partOrigin'] != jbeam_part:
                         continue
 
-                    if row_node_id in node_renames:
-                        row_data[0] = node_renames[row_node_id]
+                    new_node_id = node_renames.get(row_node_id)
+                    if new_node_id is not None:
+                        row_data[0] = new_node_id
 
-                    if row_node_id in blender_nodes:
-                        pos = blender_nodes[row_node_id]['pos']
-                        row_data[1], row_data[2], row_data[3] = pos[0], pos[1], pos[2]
+                    pos = blender_node['pos']
+                    row_data[1], row_data[2], row_data[3] = pos[0], pos[1], pos[2]
 
         # Rename node references in all other sections
         elif affect_node_references:
@@ -420,47 +430,56 @@ def set_node_renames_positions(jbeam_file_data_modified: dict, jbeam_part: str,
 
 
 def get_nodes_add_delete_rename(obj: bpy.types.Object, bm: bmesh.types.BMesh, jbeam_part: str, init_nodes_data: dict, affect_node_references: bool):
-    parts_actions = {jbeam_part: PartNodesActions()}
+    # defaultdict so looking up an existing part's actions doesn't construct a throwaway PartNodesActions like setdefault does
+    parts_actions = defaultdict(PartNodesActions)
+    parts_actions[jbeam_part] = PartNodesActions()
 
     # parts_nodes_to_add, parts_nodes_to_delete, parts_nodes_to_rename, parts_nodes_to_move = {}, {}, {}, {}
 
-    init_node_id_layer = bm.verts.layers.string[constants.VL_INIT_NODE_ID]
-    node_id_layer = bm.verts.layers.string[constants.VL_NODE_ID]
-    part_origin_layer = bm.verts.layers.string[constants.VL_NODE_PART_ORIGIN]
-    node_is_fake_layer = bm.verts.layers.int[constants.VL_NODE_IS_FAKE]
+    verts_layers = bm.verts.layers
+    init_node_id_layer = verts_layers.string[constants.VL_INIT_NODE_ID]
+    node_id_layer = verts_layers.string[constants.VL_NODE_ID]
+    part_origin_layer = verts_layers.string[constants.VL_NODE_PART_ORIGIN]
+    node_is_fake_layer = verts_layers.int[constants.VL_NODE_IS_FAKE]
 
     # Update node ids and positions from Blender into the SJSON data
 
     #init_node_id_to_part_origin = {}
 
+    # Transform all vertices to world space at once, bit for bit the same as obj.matrix_world @ v.co
+    # (mathutils multiplies in single precision, sums the products in double precision and rounds the sum back to single precision)
+    matrix_world = np.array(obj.matrix_world, dtype=np.float32)
+    products = (get_vertex_positions(obj, bm)[:, None, :] * matrix_world[None, :3, :3]).astype(np.float64)
+    world_positions = (products[:, :, 0] + products[:, :, 1] + products[:, :, 2] + matrix_world[:3, 3].astype(np.float64)).astype(np.float32)
+
+    init_nodes_data_get = init_nodes_data.get
+    nodes_to_add = parts_actions[jbeam_part].nodes_to_add
+
     blender_nodes = {}
     # Create dictionary where key is init node id and value is current blender node id and position
-    for v in bm.verts:
+    for v, pos in zip(bm.verts, map(tuple, world_positions.tolist())):
         if v[node_is_fake_layer] == 1:
             continue
 
         init_node_id = v[init_node_id_layer].decode('utf-8')
-        node_id = v[node_id_layer].decode('utf-8')
-        node_part_origin = v[part_origin_layer].decode('utf-8')
-        pos: Vector = obj.matrix_world @ v.co
 
-        init_node_data = init_nodes_data.get(init_node_id)
+        init_node_data = init_nodes_data_get(init_node_id)
         if init_node_data is None:
-            part_actions: PartNodesActions = parts_actions.setdefault(jbeam_part, PartNodesActions())
-            part_actions.nodes_to_add[init_node_id] = pos
+            nodes_to_add[init_node_id] = pos
             continue
 
+        node_id = v[node_id_layer].decode('utf-8')
+        node_part_origin = v[part_origin_layer].decode('utf-8')
+
         init_pos = init_node_data['pos']
-        if abs(pos.x - init_pos[0]) > 0.000001 or abs(pos.y - init_pos[1]) > 0.000001 or abs(pos.z - init_pos[2]) > 0.000001:
-            part_actions: PartNodesActions = parts_actions.setdefault(node_part_origin, PartNodesActions())
-            part_actions.nodes_to_move[node_id] = pos
+        if abs(pos[0] - init_pos[0]) > 0.000001 or abs(pos[1] - init_pos[1]) > 0.000001 or abs(pos[2] - init_pos[2]) > 0.000001:
+            parts_actions[node_part_origin].nodes_to_move[node_id] = pos
 
         new_pos_tup = undo_node_move_offset_and_apply_translation_to_expr(init_node_data, pos)
 
         if init_node_id != node_id:
             affected_part = True if affect_node_references else node_part_origin
-            part_actions: PartNodesActions = parts_actions.setdefault(affected_part, PartNodesActions())
-            part_actions.nodes_to_rename[init_node_id] = node_id
+            parts_actions[affected_part].nodes_to_rename[init_node_id] = node_id
 
         blender_nodes[init_node_id] = {'curr_node_id': node_id, 'pos': new_pos_tup, 'partOrigin': node_part_origin}
         #v[init_node_id_layer] = bytes(node_id, 'utf-8')
@@ -472,10 +491,9 @@ def get_nodes_add_delete_rename(obj: bpy.types.Object, bm: bmesh.types.BMesh, jb
         if init_node_id not in blender_nodes:
             node_part_origin = init_node_data.get('partOrigin', jbeam_part)
             affected_part = True if affect_node_references else node_part_origin
-            part_actions: PartNodesActions = parts_actions.setdefault(affected_part, PartNodesActions())
-            part_actions.nodes_to_delete.add(init_node_id)
+            parts_actions[affected_part].nodes_to_delete.add(init_node_id)
 
-    return blender_nodes, parts_actions
+    return blender_nodes, dict(parts_actions)
 
 
 def get_beams_add_remove(obj: bpy.types.Object, bm: bmesh.types.BMesh, init_beams_data: list, jbeam_file_data_modified: dict, jbeam_part: str, nodes_to_delete: set, affect_node_references: bool):
@@ -622,12 +640,10 @@ def add_jbeam_section(ast_nodes: list, jbeam_section_end_node_idx: int):
     if node_after_last_section.data_type == 'wsc':
         # Split WSC node into one node for inline WSCS node entry and second node after newline character
         wscs = node_after_last_section.value
-        nl_found = False
-
-        for k, char in enumerate(wscs):
-            if char == '\n':
-                nl_found = True
-                break
+        k = wscs.find('\n')
+        nl_found = k != -1
+        if not nl_found:
+            k = len(wscs) - 1
 
         node_after_last_section.value = wscs[:k]
         node_2_after_last_section = ASTNode('wsc', wscs[k:]) if nl_found else None
@@ -654,27 +670,28 @@ def add_nodes_section(ast_nodes: list, jbeam_section_end_node_idx: int):
     # "nodes":[
     #     ["id", "posX", "posY", "posZ"],
     # ],
-    ast_nodes.insert(i + 0, ASTNode('"', 'nodes'))
-    ast_nodes.insert(i + 1, ASTNode(':'))
-    ast_nodes.insert(i + 2, ASTNode('['))
+    section_ast_nodes = [
+        ASTNode('"', 'nodes'),
+        ASTNode(':'),
+        ASTNode('['),
+        ASTNode('wsc', NL_TWO_INDENT),
+        ASTNode('['),
+        ASTNode('"', 'id'),
+        ASTNode('wsc', ', '),
+        ASTNode('"', 'posX'),
+        ASTNode('wsc', ', '),
+        ASTNode('"', 'posY'),
+        ASTNode('wsc', ', '),
+        ASTNode('"', 'posZ'),
+        ASTNode(']'),
+        ASTNode('wsc', ',' + NL_INDENT),
+        ASTNode(']'),
+        ASTNode('wsc', ','),
+    ]
+    ast_nodes[i:i] = section_ast_nodes
     jbeam_section_start_node_idx = i + 2
-    ast_nodes.insert(i + 3, ASTNode('wsc', NL_TWO_INDENT))
-    i += 4
-    ast_nodes.insert(i + 0, ASTNode('['))
-    ast_nodes.insert(i + 1, ASTNode('"', 'id'))
-    ast_nodes.insert(i + 2, ASTNode('wsc', ', '))
-    ast_nodes.insert(i + 3, ASTNode('"', 'posX'))
-    ast_nodes.insert(i + 4, ASTNode('wsc', ', '))
-    ast_nodes.insert(i + 5, ASTNode('"', 'posY'))
-    ast_nodes.insert(i + 6, ASTNode('wsc', ', '))
-    ast_nodes.insert(i + 7, ASTNode('"', 'posZ'))
-    ast_nodes.insert(i + 8, ASTNode(']'))
-    ast_nodes.insert(i + 9, ASTNode('wsc', ',' + NL_INDENT))
-    i += 10
-    ast_nodes.insert(i + 0, ASTNode(']'))
-    jbeam_section_end_node_idx = i + 0
-    ast_nodes.insert(i + 1, ASTNode('wsc', ','))
-    i += 2
+    jbeam_section_end_node_idx = i + len(section_ast_nodes) - 2
+    i += len(section_ast_nodes)
 
     # Add modified original last WSCS back to end of section
     if node_2_after_last_section:
@@ -690,23 +707,24 @@ def add_beams_section(ast_nodes: list, jbeam_section_end_node_idx: int):
     # "beams":[
     #     ["id1:","id2:"],
     # ],
-    ast_nodes.insert(i + 0, ASTNode('"', 'beams'))
-    ast_nodes.insert(i + 1, ASTNode(':'))
-    ast_nodes.insert(i + 2, ASTNode('['))
+    section_ast_nodes = [
+        ASTNode('"', 'beams'),
+        ASTNode(':'),
+        ASTNode('['),
+        ASTNode('wsc', NL_TWO_INDENT),
+        ASTNode('['),
+        ASTNode('"', 'id1:'),
+        ASTNode('wsc', ','),
+        ASTNode('"', 'id2:'),
+        ASTNode(']'),
+        ASTNode('wsc', ',' + NL_INDENT),
+        ASTNode(']'),
+        ASTNode('wsc', ','),
+    ]
+    ast_nodes[i:i] = section_ast_nodes
     jbeam_section_start_node_idx = i + 2
-    ast_nodes.insert(i + 3, ASTNode('wsc', NL_TWO_INDENT))
-    i += 4
-    ast_nodes.insert(i + 0, ASTNode('['))
-    ast_nodes.insert(i + 1, ASTNode('"', 'id1:'))
-    ast_nodes.insert(i + 2, ASTNode('wsc', ','))
-    ast_nodes.insert(i + 3, ASTNode('"', 'id2:'))
-    ast_nodes.insert(i + 4, ASTNode(']'))
-    ast_nodes.insert(i + 5, ASTNode('wsc', ',' + NL_INDENT))
-    i += 6
-    ast_nodes.insert(i + 0, ASTNode(']'))
-    jbeam_section_end_node_idx = i + 0
-    ast_nodes.insert(i + 1, ASTNode('wsc', ','))
-    i += 2
+    jbeam_section_end_node_idx = i + len(section_ast_nodes) - 2
+    i += len(section_ast_nodes)
 
     # Add modified original last WSCS back to end of section
     if node_2_after_last_section:
@@ -722,25 +740,26 @@ def add_triangles_section(ast_nodes: list, jbeam_section_end_node_idx: int):
     # "triangles":[
     #     ["id1:","id2:","id3:"],
     # ],
-    ast_nodes.insert(i + 0, ASTNode('"', 'triangles'))
-    ast_nodes.insert(i + 1, ASTNode(':'))
-    ast_nodes.insert(i + 2, ASTNode('['))
+    section_ast_nodes = [
+        ASTNode('"', 'triangles'),
+        ASTNode(':'),
+        ASTNode('['),
+        ASTNode('wsc', NL_TWO_INDENT),
+        ASTNode('['),
+        ASTNode('"', 'id1:'),
+        ASTNode('wsc', ','),
+        ASTNode('"', 'id2:'),
+        ASTNode('wsc', ','),
+        ASTNode('"', 'id3:'),
+        ASTNode(']'),
+        ASTNode('wsc', ',' + NL_INDENT),
+        ASTNode(']'),
+        ASTNode('wsc', ','),
+    ]
+    ast_nodes[i:i] = section_ast_nodes
     jbeam_section_start_node_idx = i + 2
-    ast_nodes.insert(i + 3, ASTNode('wsc', NL_TWO_INDENT))
-    i += 4
-    ast_nodes.insert(i + 0, ASTNode('['))
-    ast_nodes.insert(i + 1, ASTNode('"', 'id1:'))
-    ast_nodes.insert(i + 2, ASTNode('wsc', ','))
-    ast_nodes.insert(i + 3, ASTNode('"', 'id2:'))
-    ast_nodes.insert(i + 4, ASTNode('wsc', ','))
-    ast_nodes.insert(i + 5, ASTNode('"', 'id3:'))
-    ast_nodes.insert(i + 6, ASTNode(']'))
-    ast_nodes.insert(i + 7, ASTNode('wsc', ',' + NL_INDENT))
-    i += 8
-    ast_nodes.insert(i + 0, ASTNode(']'))
-    jbeam_section_end_node_idx = i + 0
-    ast_nodes.insert(i + 1, ASTNode('wsc', ','))
-    i += 2
+    jbeam_section_end_node_idx = i + len(section_ast_nodes) - 2
+    i += len(section_ast_nodes)
 
     # Add modified original last WSCS back to end of section
     if node_2_after_last_section:
@@ -756,27 +775,28 @@ def add_quads_section(ast_nodes: list, jbeam_section_end_node_idx: int):
     # "quads":[
     #     ["id1:","id2:","id3:","id4:"],
     # ],
-    ast_nodes.insert(i + 0, ASTNode('"', 'quads'))
-    ast_nodes.insert(i + 1, ASTNode(':'))
-    ast_nodes.insert(i + 2, ASTNode('['))
+    section_ast_nodes = [
+        ASTNode('"', 'quads'),
+        ASTNode(':'),
+        ASTNode('['),
+        ASTNode('wsc', NL_TWO_INDENT),
+        ASTNode('['),
+        ASTNode('"', 'id1:'),
+        ASTNode('wsc', ','),
+        ASTNode('"', 'id2:'),
+        ASTNode('wsc', ','),
+        ASTNode('"', 'id3:'),
+        ASTNode('wsc', ','),
+        ASTNode('"', 'id4:'),
+        ASTNode(']'),
+        ASTNode('wsc', ',' + NL_INDENT),
+        ASTNode(']'),
+        ASTNode('wsc', ','),
+    ]
+    ast_nodes[i:i] = section_ast_nodes
     jbeam_section_start_node_idx = i + 2
-    ast_nodes.insert(i + 3, ASTNode('wsc', NL_TWO_INDENT))
-    i += 4
-    ast_nodes.insert(i + 0, ASTNode('['))
-    ast_nodes.insert(i + 1, ASTNode('"', 'id1:'))
-    ast_nodes.insert(i + 2, ASTNode('wsc', ','))
-    ast_nodes.insert(i + 3, ASTNode('"', 'id2:'))
-    ast_nodes.insert(i + 4, ASTNode('wsc', ','))
-    ast_nodes.insert(i + 5, ASTNode('"', 'id3:'))
-    ast_nodes.insert(i + 6, ASTNode('wsc', ','))
-    ast_nodes.insert(i + 7, ASTNode('"', 'id4:'))
-    ast_nodes.insert(i + 8, ASTNode(']'))
-    ast_nodes.insert(i + 9, ASTNode('wsc', ',' + NL_INDENT))
-    i += 10
-    ast_nodes.insert(i + 0, ASTNode(']'))
-    jbeam_section_end_node_idx = i + 0
-    ast_nodes.insert(i + 1, ASTNode('wsc', ','))
-    i += 2
+    jbeam_section_end_node_idx = i + len(section_ast_nodes) - 2
+    i += len(section_ast_nodes)
 
     # Add modified original last WSCS back to end of section
     if node_2_after_last_section:
@@ -847,6 +867,11 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
     stack = []
     stack_append = stack.append
     stack_pop = stack.pop
+    # SJSON data containers matching each stack level, so values can be looked up without walking down from the root every time
+    # (None if the level doesn't exist in the data)
+    containers_stack = [(current_jbeam_file_data, current_jbeam_file_data_modified)]
+    containers_stack_append = containers_stack.append
+    containers_stack_pop = containers_stack.pop
     in_dict = True
     pos_in_arr = 0
     temp_dict_key = None
@@ -858,6 +883,7 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
 
     jbeam_section_header = []
     jbeam_section_header_lookup = {}
+    jbeam_section_node_ref_cols = [] # indices of the header columns that reference nodes (e.g. "id1:")
     jbeam_section_def = []
     jbeam_section_row_def_idx = -1
     jbeam_entry_start_node_idx, jbeam_entry_end_node_idx = None, None
@@ -869,6 +895,8 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
     add_tris_flag = len(tris_to_add) > 0
     add_quads_flag = len(quads_to_add) > 0
 
+    in_jbeam_part = False
+
     i = 0
     while i < len(ast_nodes):
         node: ASTNode = ast_nodes[i]
@@ -878,14 +906,15 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
             continue
 
         prev_stack_size = len(stack)
-        prev_stack_head_key = stack[prev_stack_size - 1][0] if prev_stack_size > 0 else None
-        prev_in_jbeam_part = prev_stack_size > 0 and stack[0][0] == jbeam_part
+        prev_in_jbeam_part = in_jbeam_part
 
         if in_dict: # In dictionary object
             if node_type in ('{', '['): # Going down a level
                 if dict_key is not None:
                     key_val_start_node_idx_stack.append(temp_key_val_start_node_idx)
                     stack_append((dict_key, in_dict))
+                    original_container, container = containers_stack[-1]
+                    containers_stack_append((get_child_data(original_container, dict_key), get_child_data(container, dict_key)))
                     in_dict = node_type == '{'
                 else:
                     if len(stack) > 0: # Ignore outer most dictionary
@@ -898,6 +927,7 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
             elif node_type in ('}', ']'): # Going up a level
                 if prev_stack_size > 0:
                     prev_key, in_dict = stack_pop()
+                    containers_stack_pop()
                 else:
                     prev_key, in_dict = -1, None
 
@@ -926,7 +956,7 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
                     # Ignore slots section and other parts
                     if not (prev_stack_size > 1 and stack[1][0] == 'slots') and not prev_in_jbeam_part:
                         try:
-                            changed = compare_and_set_value(current_jbeam_file_data, current_jbeam_file_data_modified, stack, dict_key, node)
+                            changed = compare_and_set_value(*containers_stack[-1], dict_key, node)
                             if constants.DEBUG:
                                 if changed:
                                     print('value changed!', node.data_type, node.value)
@@ -941,6 +971,8 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
         else: # In array object
             if node_type in ('{', '['): # Going down a level
                 stack_append((pos_in_arr, in_dict))
+                original_container, container = containers_stack[-1]
+                containers_stack_append((get_child_data(original_container, pos_in_arr), get_child_data(container, pos_in_arr)))
                 in_dict = node_type == '{'
                 pos_in_arr = 0
                 temp_dict_key = None
@@ -949,6 +981,7 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
             elif node_type in ('}', ']'): # Going up a level
                 if prev_stack_size > 0:
                     prev_key, in_dict = stack_pop()
+                    containers_stack_pop()
                 else:
                     prev_key, in_dict = -1, None
 
@@ -963,7 +996,7 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
                 if not (prev_stack_size > 1 and stack[1][0] == 'slots'):
                     # Value definition
                     try:
-                        changed = compare_and_set_value(current_jbeam_file_data, current_jbeam_file_data_modified, stack, pos_in_arr, node)
+                        changed = compare_and_set_value(*containers_stack[-1], pos_in_arr, node)
                         if constants.DEBUG:
                             if changed:
                                 print('value changed!', node.data_type, node.value)
@@ -978,8 +1011,9 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
 
         stack_size = len(stack)
         stack_size_diff = stack_size - prev_stack_size # 1 = go down level, -1 = go up level, 0 = no change
-        stack_head = stack[-1] if stack_size > 0 else None
-        in_jbeam_part = stack_size > 0 and stack[0][0] == jbeam_part
+        # Being in the JBeam part can only change when the level changes
+        if stack_size_diff != 0:
+            in_jbeam_part = stack_size > 0 and stack[0][0] == jbeam_part
 
         # if constants.DEBUG:
         #     prev_node = ast_nodes[0]
@@ -1010,8 +1044,9 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
                 assert jbeam_entry_start_node_idx < jbeam_entry_end_node_idx
 
                 jbeam_def_deleted = False
+                section_key = stack[-1][0]
 
-                if stack_head[0] == 'nodes':
+                if section_key == 'nodes':
                     # If current jbeam node is part of delete list, remove the node definition
                     if len(jbeam_section_def) > 0:
                         jbeam_node_id = jbeam_section_def[jbeam_section_header_lookup['id']]
@@ -1026,21 +1061,21 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
                             #     print_ast_nodes(ast_nodes, i, 50, True, sys.stdout)
                             jbeam_def_deleted = True
 
-                elif stack_head[0] == 'beams':
+                elif section_key == 'beams':
                     # If current jbeam beam is part of delete list, remove the beam definition
                     if len(jbeam_section_def) > 0:
                         if jbeam_section_row_def_idx in beams_to_delete:
                             i = delete_jbeam_entry(ast_nodes, jbeam_section_start_node_idx, jbeam_entry_start_node_idx, jbeam_entry_end_node_idx)
                             jbeam_def_deleted = True
 
-                elif stack_head[0] == 'triangles':
+                elif section_key == 'triangles':
                     # If current jbeam tri is part of delete list, remove the tri definition
                     if len(jbeam_section_def) > 0:
                         if jbeam_section_row_def_idx in tris_to_delete:
                             i = delete_jbeam_entry(ast_nodes, jbeam_section_start_node_idx, jbeam_entry_start_node_idx, jbeam_entry_end_node_idx)
                             jbeam_def_deleted = True
 
-                elif stack_head[0] == 'quads':
+                elif section_key == 'quads':
                     # If current jbeam quad is part of delete list, remove the quad definition
                     if len(jbeam_section_def) > 0:
                         if jbeam_section_row_def_idx in quads_to_delete:
@@ -1049,14 +1084,12 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
 
                 # Delete jbeam entries if referenced node is deleted
                 if not jbeam_def_deleted and affect_node_references:
-                    if len(jbeam_section_def) > 0:
-                        len_row_header = len(jbeam_section_header)
-                        for col_idx, col in enumerate(jbeam_section_def):
-                            if col_idx < len_row_header and jbeam_section_header[col_idx].find(':') != -1:
-                                if col in nodes_to_delete:
-                                    i = delete_jbeam_entry(ast_nodes, jbeam_section_start_node_idx, jbeam_entry_start_node_idx, jbeam_entry_end_node_idx)
-                                    jbeam_def_deleted = True
-                                    break
+                    len_section_def = len(jbeam_section_def)
+                    for col_idx in jbeam_section_node_ref_cols:
+                        if col_idx < len_section_def and jbeam_section_def[col_idx] in nodes_to_delete:
+                            i = delete_jbeam_entry(ast_nodes, jbeam_section_start_node_idx, jbeam_entry_start_node_idx, jbeam_entry_end_node_idx)
+                            jbeam_def_deleted = True
+                            break
 
                 jbeam_entry_start_node_idx = None
                 jbeam_entry_end_node_idx = None
@@ -1066,6 +1099,7 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
             elif in_jbeam_part and stack_size == 1: # End of JBeam section (e.g. nodes, beams)
                 jbeam_section_end_node_idx = i
                 assert jbeam_section_start_node_idx < jbeam_section_end_node_idx
+                prev_stack_head_key = prev_key # key of the section that just ended
 
                 if prev_stack_head_key == 'nodes' and nodes_to_add:
                     # Add nodes to add to end of nodes section
@@ -1093,6 +1127,7 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
 
                 jbeam_section_header.clear()
                 jbeam_section_header_lookup.clear()
+                jbeam_section_node_ref_cols.clear()
                 jbeam_section_row_def_idx = -1
 
             elif prev_in_jbeam_part and stack_size == 0: # End of JBeam part
@@ -1132,6 +1167,8 @@ def update_ast_nodes(ast_nodes: list, current_jbeam_file_data: dict, current_jbe
                     section_row = stack[2][0]
                     if section_row == 0:
                         # Section header row
+                        if isinstance(node.value, str) and ':' in node.value:
+                            jbeam_section_node_ref_cols.append(len(jbeam_section_header))
                         jbeam_section_header_lookup[node.value] = len(jbeam_section_header)
                         jbeam_section_header.append(node.value)
                     else:
@@ -1153,9 +1190,10 @@ def export_file(jbeam_filepath: str, parts: list[bpy.types.Object], data: dict,
         print(f"File doesn't exist! {jbeam_filepath}", file=sys.stderr)
         return reimport_needed
     jbeam_file_data, cached_changed = jbeam_io.get_jbeam(jbeam_filepath, True, False)
-    jbeam_file_data_modified, cached_changed = jbeam_io.get_jbeam(jbeam_filepath, True, False)
-    if jbeam_file_data is None or jbeam_file_data_modified is None:
+    if jbeam_file_data is None:
         return reimport_needed
+    # Only the parts being updated get modified, so the rest can be shared with the original data instead of copying the whole file again
+    jbeam_file_data_modified = dict(jbeam_file_data)
 
     # The imported jbeam data is used to build an AST from
     ast_data = sjsonast_parse(jbeam_file_str)
@@ -1166,6 +1204,14 @@ def export_file(jbeam_filepath: str, parts: list[bpy.types.Object], data: dict,
 
     update_all_parts = True in parts_to_update
 
+    # These don't change per part, so look them up once
+    all_parts_nodes_actions: PartNodesActions | None = parts_nodes_actions.get(True)
+
+    #init_nodes_data = data.get('nodes')
+    init_beams_data = data.get('beams')
+    init_tris_data = data.get('triangles', [])
+    init_quads_data = data.get('quads', [])
+
     for obj in parts:
         obj_data = obj.data
         jbeam_part = obj_data[constants.MESH_JBEAM_PART]
@@ -1187,19 +1233,16 @@ def export_file(jbeam_filepath: str, parts: list[bpy.types.Object], data: dict,
             nodes_to_add, nodes_to_delete, node_renames, node_moves = {}, set(), {}, {}
 
         # Add "all parts" actions also
-        part_nodes_actions: PartNodesActions | None = parts_nodes_actions.get(True)
-        if part_nodes_actions is not None:
-            for node, pos in part_nodes_actions.nodes_to_add.items():
+        if all_parts_nodes_actions is not None:
+            for node, pos in all_parts_nodes_actions.nodes_to_add.items():
                 nodes_to_add[node] = pos
-            for node in part_nodes_actions.nodes_to_delete:
+            for node in all_parts_nodes_actions.nodes_to_delete:
                 nodes_to_delete.add(node)
-            for old_id, new_id in part_nodes_actions.nodes_to_rename.items():
+            for old_id, new_id in all_parts_nodes_actions.nodes_to_rename.items():
                 node_renames[old_id] = new_id
 
-        #init_nodes_data = data.get('nodes')
-        init_beams_data = data.get('beams')
-        init_tris_data = data.get('triangles', [])
-        init_quads_data = data.get('quads', [])
+        if jbeam_part in jbeam_file_data:
+            jbeam_file_data_modified[jbeam_part] = fast_deepcopy(jbeam_file_data[jbeam_part])
 
         set_node_renames_positions(jbeam_file_data_modified, jbeam_part, blender_nodes, node_renames, affect_node_references)
 
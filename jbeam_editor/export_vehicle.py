@@ -19,13 +19,13 @@
 # SOFTWARE.
 
 import traceback
-import pickle
 
 import bpy
 
 import bmesh
 
 from . import constants
+from . import utils
 from . import text_editor
 from . import export_utils
 
@@ -34,13 +34,15 @@ import timeit
 
 def export(veh_collection: bpy.types.Collection, active_obj: bpy.types.Object):
     try:
-        t0 = timeit.default_timer()
+        if constants.DEBUG_TIMING:
+            t0 = timeit.default_timer()
         context = bpy.context
         scene = context.scene
         ui_props = scene.ui_properties
         affect_node_references = ui_props.affect_node_references
 
-        veh_bundle = pickle.loads(veh_collection[constants.COLLECTION_VEHICLE_BUNDLE])
+        # Shared through the unpickle cache, read only
+        veh_bundle = utils.cached_pickle_loads((constants.COLLECTION_VEHICLE_BUNDLE, veh_collection.name), veh_collection[constants.COLLECTION_VEHICLE_BUNDLE])
         vdata = veh_bundle['vdata']
         init_nodes_data = vdata.get('nodes')
 
@@ -119,8 +121,9 @@ def export(veh_collection: bpy.types.Collection, active_obj: bpy.types.Object):
 
         bpy.ops.object.location_clear()
 
-        t1 = timeit.default_timer()
-        print('Exporting/reimporting Time', round(t1 - t0, 2), 's')
+        if constants.DEBUG_TIMING:
+            t1 = timeit.default_timer()
+            print('Exporting/reimporting Time', round(t1 - t0, 2), 's')
 
     except:
         traceback.print_exc()
@@ -19,7 +19,6 @@
 # SOFTWARE.
 
 from pathlib import Path
-import pickle
 import traceback
 
 import bpy
@@ -214,7 +213,7 @@ def import_jbeam_part(context: bpy.types.Context, jbeam_file_path: str, jbeam_fi
         bm.to_mesh(obj_data)
 
         obj_data.update()
-        obj_data[constants.MESH_SINGLE_JBEAM_PART_DATA] = pickle.dumps(part_data, -1)
+        obj_data[constants.MESH_SINGLE_JBEAM_PART_DATA] = utils.cached_pickle_dumps((constants.MESH_SINGLE_JBEAM_PART_DATA, obj_data.name), part_data)
 
         # make collection
         jbeam_collection = bpy.data.collections.get('JBeam Objects')
@@ -273,7 +272,7 @@ def reimport_jbeam(context: bpy.types.Context, jbeam_objects: bpy.types.Collecti
             bm.free()
             obj_data.update()
 
-        obj_data[constants.MESH_SINGLE_JBEAM_PART_DATA] = pickle.dumps(part_data, -1)
+        obj_data[constants.MESH_SINGLE_JBEAM_PART_DATA] = utils.cached_pickle_dumps((constants.MESH_SINGLE_JBEAM_PART_DATA, obj_data.name), part_data)
 
         context.scene['jbeam_editor_reimporting_jbeam'] = 1 # Prevents exporting jbeam
 
@@ -21,7 +21,6 @@
 from pathlib import Path
 import re
 import sys
-import pickle
 import traceback
 
 import bpy
@@ -336,7 +335,7 @@ def generate_meshes(vehicle_bundle: dict):
         vehicle_parts_collection.objects.link(part_obj)
 
     # store vehicle data in collection
-    vehicle_parts_collection[constants.COLLECTION_VEHICLE_BUNDLE] = pickle.dumps(vehicle_bundle, -1)
+    vehicle_parts_collection[constants.COLLECTION_VEHICLE_BUNDLE] = utils.cached_pickle_dumps((constants.COLLECTION_VEHICLE_BUNDLE, vehicle_parts_collection.name), vehicle_bundle)
     vehicle_parts_collection[constants.COLLECTION_IO_CTX] = io_ctx
     vehicle_parts_collection[constants.COLLECTION_VEH_FILES] = veh_files
     vehicle_parts_collection[constants.COLLECTION_PC_FILEPATH] = pc_filepath
@@ -439,7 +438,7 @@ def reimport_vehicle(context: bpy.types.Context, veh_collection: bpy.types.Colle
             # Create Blender meshes from JBeam data
             _reimport_vehicle(context, veh_collection, vehicle_bundle)
 
-        veh_collection[constants.COLLECTION_VEHICLE_BUNDLE] = pickle.dumps(vehicle_bundle, -1)
+        veh_collection[constants.COLLECTION_VEHICLE_BUNDLE] = utils.cached_pickle_dumps((constants.COLLECTION_VEHICLE_BUNDLE, veh_collection.name), vehicle_bundle)
 
         context.scene['jbeam_editor_reimporting_jbeam'] = 1 # Prevents exporting jbeam
 
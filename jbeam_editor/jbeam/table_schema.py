@@ -18,13 +18,15 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from itertools import repeat
 import math
 from pickle import loads as pickle_loads
-from pickle import dumps as pickle_dumps
-from re import match as re_match
+from re import compile as re_compile
 import sys
 
-from ..utils import ignore_sections, row_dict_deepcopy, Metadata
+from ..utils import ignore_sections, row_dict_deepcopy, copy_pickle_dumps, Metadata
+
+attribute_name_re = re_compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
 
 # these are defined in C, do not change the values
 NORMALTYPE = 0
@@ -88,12 +90,40 @@ typeIds = {
 def replace_special_values(val):
     return val
 
+# Keyed on the pickled table and options (tables are rebuilt on every import, so their ids can't be used)
+# Least recently used entries are dropped past MEMO_MAX_SIZE. A reimport walks every table of the vehicle in the same order,
+# so the limit has to stay well above the table count of a whole vehicle or the memo never hits.
 memo = {}
+MEMO_MAX_SIZE = 4096
+
+MAX_REPORTED_ROWS = 16
+
+def report_rows_missing_header(header: list, rows: list):
+    if not rows:
+        return
+    lines = []
+    for rk, row_value in rows[:MAX_REPORTED_ROWS]:
+        lines.append("*** unable to parse row, header for entry is missing: ")
+        lines.append(f"*** header:  {header}  missing key: {rk} -- is the section header too short?")
+        lines.append(f"*** row:  {row_value}")
+    if len(rows) > MAX_REPORTED_ROWS:
+        lines.append(f"*** ... and {len(rows) - MAX_REPORTED_ROWS} more rows with missing header entries")
+    lines.append('')
+    sys.stderr.write('\n'.join(lines))
+
+# Convert metadata variable reference in list from index to key using header
+def metadata_var_indices_to_keys(metadata: Metadata, header: list):
+    metadata_data = metadata._data
+    if metadata_data:
+        for var in [*metadata_data.keys()]:
+            if isinstance(var, int):
+                metadata_data[header[var]] = metadata_data.pop(var)
 
 def process_table_with_schema_destructive(jbeam_table: list, new_dict: dict, input_options=None):
-    encoded = (pickle_dumps(jbeam_table, -1), pickle_dumps(input_options, -1))
-    if memo.get(encoded) is not None:
-        out = memo[encoded]
+    encoded = (copy_pickle_dumps(jbeam_table), copy_pickle_dumps(input_options))
+    out = memo.pop(encoded, None)
+    if out is not None:
+        memo[encoded] = out # move to most recently used
         new_dict.update(pickle_loads(out[0]))
         return out[1]
 
@@ -105,18 +135,23 @@ def process_table_with_schema_destructive(jbeam_table: list, new_dict: dict, inp
 
     header_size = len(header)
     header_size1 = header_size + 1
+    header_cols = header[:header_size]
     if header[-1] != 'options':
         header.append('options')
     new_list_size = 0
-    local_options = row_dict_deepcopy(input_options) if input_options is not None else {}
+    # Only the metadata gets modified in place, other values are replaced by modifier rows and copied per row anyway
+    local_options = input_options.copy() if input_options is not None else {}
     local_options_update = local_options.update
 
-    if not local_options.get(Metadata):
-        local_options[Metadata] = Metadata()
+    options_metadata = local_options.get(Metadata)
+    local_options[Metadata] = Metadata(options_metadata) if options_metadata else Metadata()
 
     # remove the header from the data, as we dont need it anymore
     jbeam_table.pop(0)
 
+    # rows with more cells than the header, reported once after the walk
+    rows_missing_header = []
+
     # walk the list entries
     for row_key, row_value in enumerate(jbeam_table):
         if isinstance(row_value, dict):
@@ -147,6 +182,7 @@ def process_table_with_schema_destructive(jbeam_table: list, new_dict: dict, inp
                 print("*** Invalid table header, must be as long as all table cells (plus one additional options column):", file=sys.stderr)
                 print("*** Table header: ", header, file=sys.stderr)
                 print("*** Mismatched row: ", row_value, file=sys.stderr)
+                report_rows_missing_header(header, rows_missing_header)
                 return -1
 
             # walk the table row
@@ -154,11 +190,12 @@ def process_table_with_schema_destructive(jbeam_table: list, new_dict: dict, inp
             new_row = row_dict_deepcopy(local_options)
             new_row_update = new_row.update
 
+            # check if inline options are provided, merge them then
+            # (they can only be in the one cell past the header)
             if len_row_value == header_size:
-                row_value.append({Metadata: Metadata()})
-                len_row_value += 1
+                # no inline options, so only the options metadata needs its variable references converted
+                metadata_var_indices_to_keys(new_row[Metadata], header)
 
-            # check if inline options are provided, merge them then
             for rk in range(header_size, len_row_value):
                 rv = row_value[rk]
                 if isinstance(rv, dict):
@@ -168,11 +205,7 @@ def process_table_with_schema_destructive(jbeam_table: list, new_dict: dict, inp
 
                     new_row_metadata = new_row[Metadata]
                     new_row_metadata.merge(rv_metadata)
-
-                    # Convert metadata variable reference in list from index to key using header
-                    for var in [*new_row_metadata._data.keys()]:
-                        if isinstance(var, int):
-                            new_row_metadata._data[header[var]] = new_row_metadata._data.pop(var)
+                    metadata_var_indices_to_keys(new_row_metadata, header)
 
                     new_row_update(rv)
                     new_row[Metadata] = new_row_metadata
@@ -185,13 +218,9 @@ def process_table_with_schema_destructive(jbeam_table: list, new_dict: dict, inp
                     # break
 
             # now care about the rest
-            for rk, rv in enumerate(row_value):
-                if rk >= header_size:
-                    print("*** unable to parse row, header for entry is missing: ", file=sys.stderr)
-                    print("*** header: ", header, ' missing key: ' + str(rk) + ' -- is the section header too short?', file=sys.stderr)
-                    print("*** row: ", row_value, file=sys.stderr)
-                else:
-                    new_row[header[rk]] = rv
+            new_row_update(zip(header_cols, row_value))
+            for rk in range(header_size, len(row_value)):
+                rows_missing_header.append((rk, row_value))
 
             # seems to only be true during "Assembling tables" and processing certain tables
             # e.g. nodes section
@@ -206,9 +235,13 @@ def process_table_with_schema_destructive(jbeam_table: list, new_dict: dict, inp
 
         else:
             print('*** Invalid table row:', row_value, file=sys.stderr)
+            report_rows_missing_header(header, rows_missing_header)
             return -1
 
-    memo[encoded] = (pickle_dumps(new_dict, -1), new_list_size)
+    report_rows_missing_header(header, rows_missing_header)
+    if len(memo) >= MEMO_MAX_SIZE:
+        del memo[next(iter(memo))]
+    memo[encoded] = (copy_pickle_dumps(new_dict), new_list_size)
     return new_list_size
 
 
@@ -218,17 +251,12 @@ def convert_dict_to_list_tables(vehicle: dict):
     for k, tbl in vehicle.items():
         if isinstance(tbl, dict) and len(tbl) > 0 and isinstance(next(iter(tbl)), int):
             # Dictionary contains integer keys, so convert it into a list
-            new_table = []
-            new_table_append = new_table.append
-
-            for row_key, row_value in tbl.items():
-                if not isinstance(row_key, int):
-                    print(f'Table unexpectedly has non integer key! row key: {row_key}, row value {row_value}', file=sys.stderr)
-                    return False
+            if not all(map(isinstance, tbl, repeat(int))):
+                row_key = next(row_key for row_key in tbl if not isinstance(row_key, int))
+                print(f'Table unexpectedly has non integer key! row key: {row_key}, row value {tbl[row_key]}', file=sys.stderr)
+                return False
 
-                new_table_append(row_value)
-
-            new_tables[k] = new_table
+            new_tables[k] = list(tbl.values())
 
     # Set vehicle with new jbeam tables
     for k, tbl in new_tables.items():
@@ -246,12 +274,15 @@ def check_node_references(vehicle: dict):
 
         # TODO: need to account for dictionaries
         if isinstance(jbeam_table, list):
+            # Node reference columns of the whole table, so rows only need to look those up
+            ref_cols = [rk for rk in set().union(*jbeam_table) if isinstance(rk, str) and ':' in rk] if nodes else None
             row_value: dict
             for row_key, row_value in enumerate(jbeam_table):
                 is_virtual = False
                 if nodes:
-                    for rk, rv in row_value.items():
-                        if isinstance(rk, str) and isinstance(rv, str) and rk.find(':') != -1 and rv not in nodes:
+                    for rk in ref_cols:
+                        rv = row_value.get(rk)
+                        if isinstance(rv, str) and rv not in nodes:
                             is_virtual = True
                             break
                     if is_virtual:
@@ -278,17 +309,20 @@ def process(vehicle: dict):
     vehicle['options'] = vehicle.get('options', {})
 
     # Walk through everything and look for options
-    for key_entry in [*vehicle.keys()]:
-        entry = vehicle[key_entry]
+    options = vehicle['options']
+    option_keys = []
+    for key_entry, entry in vehicle.items():
         if not isinstance(entry, (dict, list)):
             # Seems to be an option, add it to the vehicle options
-            vehicle['options'][key_entry] = entry
-            vehicle.pop(key_entry, None)
+            options[key_entry] = entry
+            option_keys.append(key_entry)
+    for key_entry in option_keys:
+        del vehicle[key_entry]
 
     # Then walk through all keys/entries of the vehicle
     for key_entry, entry in vehicle.items():
         # verify element name
-        if re_match(r'^[a-zA-Z_]+[a-zA-Z0-9_]*$', key_entry) is None:
+        if attribute_name_re.match(key_entry) is None:
             print(f"*** Invalid attribute name '{key_entry}'", sys.stderr)
             return False
 
@@ -304,6 +338,10 @@ def process(vehicle: dict):
                     vehicle['validTables'][key_entry] = True
             else:
                 if key_entry not in vehicle['validTables']:
+                    if len(entry) == 1 and isinstance(entry[0], list):
+                        # Only a header row, so there is nothing to process
+                        vehicle[key_entry] = {}
+                        continue
                     new_list = {}
                     new_list_size = process_table_with_schema_destructive(entry, new_list, vehicle['options'])
                     # This was a correct table, record that so we do not process it twice
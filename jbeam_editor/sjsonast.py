@@ -32,6 +32,9 @@ _nodes: list
 _nodes_append: Callable
 
 class ASTNode:
+    # A large file has hundreds of thousands of nodes, so skip the per instance __dict__
+    __slots__ = ('data_type', 'value', 'precision', 'prefix_plus', 'add_post_fix_dot', 'start_pos', 'end_pos')
+
     def __init__(self, data_type, value=None, *, precision=None, prefix_plus=False, add_post_fix_dot=False):
         self.data_type = data_type
         self.value = value
@@ -278,8 +281,15 @@ def stringify_other(node):
     return node.data_type
 
 
+def iter_stringify_nodes(nodes):
+    # Yields the nodes' text one by one, so it can be streamed to a file without building the whole string
+    to_str_lookup = _to_str_lookup
+    for node in nodes:
+        yield to_str_lookup[node.data_type](node)
+
+
 def stringify_nodes(nodes):
-    return ''.join(_to_str_lookup[node.data_type](node) for node in nodes)
+    return ''.join(iter_stringify_nodes(nodes))
 
 
 _to_ast_node_lookup = {
@@ -205,23 +205,28 @@ def check_int_files_for_changes(context: bpy.types.Context, filenames: list, und
     files_changed_short_names = None
     files_changed = None
 
+    # Look up the scene properties once instead of per file
+    prev_texts = scene[SCENE_PREV_TEXTS]
+    short_to_full_filename = scene[SCENE_SHORT_TO_FULL_FILENAME]
+    texts = bpy.data.texts
+
     for filename in filenames:
         short_filename = _to_short_filename(filename)
-        text = bpy.data.texts[short_filename]
-        curr_file_text = text.as_string()
-        last_file_text = scene[SCENE_PREV_TEXTS].get(short_filename, False)
+        text = texts[short_filename]
+        last_file_text = prev_texts.get(short_filename, False)
         if last_file_text == False:
             continue
-        filename = scene[SCENE_SHORT_TO_FULL_FILENAME].get(short_filename)
+        filename = short_to_full_filename.get(short_filename)
         if filename is None:
             continue
+        curr_file_text = text.as_string()
 
         if curr_file_text != last_file_text:
             # File changed!
             if constants.DEBUG:
                 print('file changed!', filename)
 
-            scene[SCENE_PREV_TEXTS][short_filename] = curr_file_text
+            prev_texts[short_filename] = curr_file_text
 
             if reimport:
                 import_jbeam.on_file_change(context, filename, regenerate_mesh)
@@ -18,22 +18,31 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import ctypes
-from pickle import loads as pickle_loads, dumps as pickle_dumps
+import copyreg
+from functools import lru_cache
+from io import BytesIO
+from itertools import chain
+import math
+import os
+from pickle import Pickler, loads as pickle_loads, dumps as pickle_dumps
+import shutil
+import struct
 import sys
 
 import bpy
+import bmesh
 import numpy as np
 
 from . import constants
 from . import bng_sjson
 
-ignore_sections = {'maxIDs': True, 'options': True}
+ignore_sections = frozenset(('maxIDs', 'options'))
 
 class Metadata:
     def __init__(self, other=None):
         if other is not None:
-            self._data = fast_deepcopy(other._data)
+            # Values are per variable dicts of scalars/strings, so copying two levels deep is a full copy
+            self._data = {var: keys.copy() for var, keys in other._data.items()}
         else:
             self._data = {}
 
@@ -62,6 +71,26 @@ class Metadata:
         return str(self._data)
 
 
+# Also needed to load part data saved in .blend files by the addon version that pickled Metadata with it
+def _metadata_from_data(data: dict):
+    metadata = Metadata.__new__(Metadata)
+    metadata._data = data
+    return metadata
+
+
+def _reduce_metadata(metadata: Metadata):
+    return (_metadata_from_data, (metadata._data,))
+
+
+# Metadata pickles as just its data dict in in memory copies.
+# Blobs stored in .blend files keep the default pickle format, so other addon versions can still load them.
+_copy_dispatch_table = copyreg.dispatch_table.copy()
+_copy_dispatch_table[Metadata] = _reduce_metadata
+
+class _CopyPickler(Pickler):
+    dispatch_table = _copy_dispatch_table
+
+
 # https://blender.stackexchange.com/a/110112
 # icon types = https://docs.blender.org/api/current/bpy_types_enum_items/icon_items.html#rna-enum-icon-items
 def show_message_box(icon = 'INFO', title = "Message Box", message = ""):
@@ -85,12 +114,52 @@ def read_file(filepath: str):
 
 def write_file(filepath: str, content: str):
     """writes contents to a file"""
+    return write_file_chunks(filepath, (content,))
+
+
+def write_file_chunks(filepath: str, chunks):
+    """writes an iterable of strings to a file
+
+    The file is replaced atomically, except hard linked files, which are written in place (not atomic) to keep their links.
+    """
+    # Write to the file a symlink points to instead of replacing the symlink
+    filepath = os.path.realpath(filepath)
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        stat = None
+
+    # Swapping in a new file would get around the file being read only, which writing to it directly never did
+    if stat is not None and not os.access(filepath, os.W_OK):
+        print(f"[Errno 13] Permission denied: '{filepath}'", file=sys.stderr)
+        return False
+
+    # Write to a temporary file first and swap it in, so a failed write never leaves a half written file behind
+    in_place = stat is not None and stat.st_nlink > 1
+    tmp_filepath = filepath if in_place else filepath + '.tmp'
     try:
-        with open(filepath, mode='w', encoding='utf8') as f:
-            f.write(content)
+        with open(tmp_filepath, mode='w', encoding='utf8') as f:
+            f.writelines(chunks)
+        if not in_place:
+            if stat is not None:
+                # Keep the permissions and (where allowed) the owner of the file being replaced
+                shutil.copymode(filepath, tmp_filepath)
+                if hasattr(os, 'chown'):
+                    try:
+                        os.chown(tmp_filepath, stat.st_uid, stat.st_gid)
+                    except OSError:
+                        pass
+            os.replace(tmp_filepath, filepath)
     except IOError as e:
         print(e, file=sys.stderr)
         return False
+    finally:
+        # Also clean up when producing the chunks raised
+        if not in_place and os.path.lexists(tmp_filepath):
+            try:
+                os.remove(tmp_filepath)
+            except OSError:
+                pass
 
     return True
 
@@ -114,8 +183,53 @@ def sjson_read_file(filepath: str):
     return sjson_decode(content, filepath)
 
 
+def copy_pickle_dumps(x):
+    """pickles an object for in memory copies only, never store the result in a .blend file"""
+    f = BytesIO()
+    _CopyPickler(f, -1).dump(x)
+    return f.getvalue()
+
+
 def fast_deepcopy(x):
-    return pickle_loads(pickle_dumps(x, -1))
+    return pickle_loads(copy_pickle_dumps(x))
+
+
+# Last unpickled object per ID property (keyed on property and datablock name). Least recently used keys are dropped past
+# PICKLE_LOADS_CACHE_MAX_SIZE, and the whole cache is cleared when a .blend file is loaded or a new one is created.
+_pickle_loads_cache = {}
+PICKLE_LOADS_CACHE_MAX_SIZE = 256
+
+def _pickle_loads_cache_set(key, blob: bytes, obj):
+    _pickle_loads_cache.pop(key, None)
+    if len(_pickle_loads_cache) >= PICKLE_LOADS_CACHE_MAX_SIZE:
+        del _pickle_loads_cache[next(iter(_pickle_loads_cache))]
+    _pickle_loads_cache[key] = (blob, obj)
+
+
+def cached_pickle_loads(key, blob: bytes):
+    """unpickles a blob, reusing the last result for the key if the blob didn't change
+
+    The result is shared with every other caller passing the same blob, so it must never be modified.
+    Use fast_deepcopy on it first if it needs changing.
+    """
+    entry = _pickle_loads_cache.get(key)
+    if entry is not None and entry[0] == blob:
+        _pickle_loads_cache_set(key, *entry) # move to most recently used
+        return entry[1]
+    obj = pickle_loads(blob)
+    _pickle_loads_cache_set(key, blob, obj)
+    return obj
+
+
+def cached_pickle_dumps(key, obj):
+    """pickles an object and primes the cached_pickle_loads cache with it (object must not be modified afterwards)"""
+    blob = pickle_dumps(obj, -1)
+    _pickle_loads_cache_set(key, blob, obj)
+    return blob
+
+
+def clear_pickle_loads_cache():
+    _pickle_loads_cache.clear()
 
 
 def row_dict_deepcopy(in_d: dict):
@@ -188,14 +302,57 @@ def is_number(x):
     return type(x) in (int, float)
 
 
+_c_float_struct = struct.Struct('f')
+_c_float_pack, _c_float_unpack = _c_float_struct.pack, _c_float_struct.unpack
+
 def to_c_float(num):
-    return ctypes.c_float(num).value
+    # Round trip through a packed 32 bit float, which is cheaper than creating a ctypes.c_float
+    try:
+        return _c_float_unpack(_c_float_pack(num))[0]
+    except OverflowError:
+        # Before Python 3.11, packing a finite value out of the float range raises instead of giving inf like ctypes.c_float
+        return math.copysign(math.inf, num)
+
+
+@lru_cache(maxsize=4096)
+def _format_c_float(fval: float):
+    return np.format_float_positional(fval, precision=4, unique=True, trim = '0')
 
 
 def to_float_str(val):
-    return np.format_float_positional(to_c_float(val), precision=4, unique=True, trim = '0')
+    fval = to_c_float(val)
+    # Whole numbers are the common case and format the same with '%.1f' (which also keeps the sign of -0.0, unlike the cache keys)
+    if fval.is_integer() and -1e15 < fval < 1e15:
+        return '%.1f' % fval
+    return _format_c_float(fval)
+
+
+def to_float_str_array(vals):
+    # Same formatting as to_float_str, but done for a whole NumPy array at once
+    strs = np.char.rstrip(np.char.mod('%.4f', np.asarray(vals, dtype=np.float32)), '0')
+    return np.where(np.char.endswith(strs, '.'), np.char.add(strs, '0'), strs)
+
+
+def get_vertex_positions(obj: bpy.types.Object, bm: bmesh.types.BMesh = None):
+    """returns the local vertex positions of a mesh object as a (n, 3) float32 array"""
+    # In edit mode the mesh data is stale, so read the positions from the open edit bmesh instead of flushing it with update_from_editmode
+    if obj.mode == 'EDIT':
+        if bm is None:
+            bm = bmesh.from_edit_mesh(obj.data)
+        bm_verts = bm.verts
+        coords = np.fromiter(chain.from_iterable(v.co for v in bm_verts), dtype=np.float32, count=len(bm_verts) * 3)
+        return coords.reshape(-1, 3)
+
+    verts = obj.data.vertices
+    coords = np.empty(len(verts) * 3, dtype=np.float32)
+    verts.foreach_get('co', coords)
+    return coords.reshape(-1, 3)
 
 
+@lru_cache(maxsize=4096)
 def get_float_precision(val):
     fval = float(val)
+    # Whole numbers have no decimals, no need to format them
+    if fval.is_integer():
+        return 0
     return min(4, max(len((f'%.4g' % abs(fval - int(fval)))) - 2, 0))
@@ -0,0 +1,101 @@
+# Copyright (c) 2023 BeamNG GmbH, Angelo Matteo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import bpy
+import bmesh
+import ctypes
+import os
+import random
+import tempfile
+
+import numpy as np
+
+from jbeam_editor import constants
+from jbeam_editor import export_jbeam
+
+import pytest
+
+
+# Per vertex formatter export_new_jbeam replaced, to compare its output against
+def old_export_new_jbeam_str(obj_name, node_ids, positions):
+    def to_float_str(val):
+        return np.format_float_positional(ctypes.c_float(val).value, precision=4, unique=True, trim = '0')
+
+    pos_strs = [(to_float_str(x), to_float_str(y), to_float_str(z)) for x, y, z in positions]
+    abs_pos_strs = [tuple(s.replace('-','',1) for s in pos_str) for pos_str in pos_strs]
+    longest_node_name = max((len(node_id) for node_id in node_ids), default=0)
+    longest_x = max((len(abs_pos_str[0]) for abs_pos_str in abs_pos_strs), default=0)
+    longest_y = max((len(abs_pos_str[1]) for abs_pos_str in abs_pos_strs), default=0)
+
+    nodes = ['["id", "posX", "posY", "posZ"]']
+    for node_id, pos_str, abs_pos_str in zip(node_ids, pos_strs, abs_pos_strs):
+        x_space = ((pos_str[0][0] != '-' and 1 or 0) + longest_node_name - len(node_id)) * ' '
+        y_space = ((pos_str[1][0] != '-' and 1 or 0) + longest_x - len(abs_pos_str[0])) * ' '
+        z_space = ((pos_str[2][0] != '-' and 1 or 0) + longest_y - len(abs_pos_str[1])) * ' '
+        nodes.append('["{}",{} {},{} {},{} {}]'.format(node_id, x_space, pos_str[0], y_space, pos_str[1], z_space, pos_str[2]))
+
+    return '{\n"' + obj_name + '": {\n    "nodes": [\n        ' + ',\n        '.join(nodes) + '\n    ],\n},\n}'
+
+
+def export_new_jbeam_str(num_nodes, mode):
+    random.seed(num_nodes)
+    node_ids = [f'n{random.randint(0, 10 ** random.randint(0, 5))}' for _ in range(num_nodes)]
+    positions = [tuple(random.choice((random.uniform(-3, 3), round(random.uniform(-3, 3), 2), 0.0, -0.0, 1.0)) for _ in range(3)) for _ in range(num_nodes)]
+
+    mesh = bpy.data.meshes.new('export_new_jbeam')
+    bm = bmesh.new()
+    node_id_layer = bm.verts.layers.string.new(constants.VL_NODE_ID)
+    for node_id, pos in zip(node_ids, positions):
+        bm.verts.new(pos)[node_id_layer] = bytes(node_id, 'utf-8')
+    bm.to_mesh(mesh)
+    bm.free()
+
+    obj = bpy.data.objects.new('export_new_jbeam', mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode=mode)
+
+    if mode == 'EDIT':
+        bm = bmesh.from_edit_mesh(mesh)
+    else:
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+    node_id_layer = bm.verts.layers.string[constants.VL_NODE_ID]
+
+    obj_name = obj.name
+    filepath = os.path.join(tempfile.mkdtemp(), 'export_new_jbeam.jbeam')
+    export_jbeam.export_new_jbeam(bpy.context, obj, mesh, bm, None, node_id_layer, filepath)
+    if mode != 'EDIT':
+        bm.free()
+
+    bpy.ops.object.mode_set(mode='OBJECT')
+    bpy.data.objects.remove(obj, do_unlink=True)
+    bpy.data.meshes.remove(mesh)
+
+    with open(filepath, encoding='utf-8') as f:
+        return f.read(), old_export_new_jbeam_str(obj_name, node_ids, positions)
+
+
+# Export meshes of different sizes in object and edit mode, output same as the old per vertex formatter (valid)
+@pytest.mark.parametrize('num_nodes', [0, 1, 5, 200])
+@pytest.mark.parametrize('mode', ['OBJECT', 'EDIT'])
+def test_1(num_nodes, mode):
+    res, expected = export_new_jbeam_str(num_nodes, mode)
+    assert res == expected
@@ -0,0 +1,157 @@
+# Copyright (c) 2023 BeamNG GmbH, Angelo Matteo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import bpy
+
+import os
+
+from jbeam_editor import constants
+from jbeam_editor import export_jbeam
+from jbeam_editor import export_utils
+from jbeam_editor.jbeam import table_schema
+
+import pytest
+
+from test_blender_plugin_helper import JBeamEditorTest
+
+jbeam_editor_test = JBeamEditorTest('export_caching')
+
+
+def count_export_file_calls(monkeypatch):
+    calls = []
+    export_file = export_utils.export_file
+
+    def counted_export_file(*args, **kwargs):
+        calls.append(args[0])
+        return export_file(*args, **kwargs)
+
+    monkeypatch.setattr(export_utils, 'export_file', counted_export_file)
+    return calls
+
+
+# Import, choose JBeam mesh, export twice without changes (second export skipped), force export (not skipped), move node nl10 from (0.8,-0.8,-0.2) to (-0.84,0.99,10) (not skipped), export (valid)
+def test_1(monkeypatch):
+    jbeam_editor_test.set_test_to_run(test_1.__name__)
+    calls = count_export_file_calls(monkeypatch)
+
+    # Import chosen part from JBeam file
+    jbeam_editor_test.import_jbeam()
+    jbeam_editor_test.select_imported_jbeam_mesh()
+
+    # Nothing changed since the first export, so the second one is skipped
+    jbeam_editor_test.export_jbeam()
+    assert len(calls) == 1
+    jbeam_editor_test.export_jbeam()
+    assert len(calls) == 1
+
+    # Forced exports (layer only edits, Force JBeam Sync) are never skipped
+    export_jbeam.auto_export(jbeam_editor_test.import_part, force=True)
+    assert len(calls) == 2
+
+    # Moving a node changes the export state, so it's exported again
+    jbeam_editor_test.move_nodes_from_imported_jbeam_mesh({'nl10': (-0.84,  0.99, 10)})
+    assert len(calls) == 3
+
+    # Export JBeam file and test result
+    assert jbeam_editor_test.export_jbeam_to_file() == {'FINISHED'}
+    assert jbeam_editor_test.test_result()
+    jbeam_editor_test.cleanup()
+
+
+# Import, choose JBeam mesh, export to disk twice without changes (file left untouched, no temporary files left behind) (valid)
+def test_2():
+    jbeam_editor_test.set_test_to_run(test_2.__name__)
+
+    # Import chosen part from JBeam file
+    jbeam_editor_test.import_jbeam()
+    jbeam_editor_test.select_imported_jbeam_mesh()
+
+    # The part on disk already matches, so neither export writes the file
+    stat = os.stat(jbeam_editor_test.temp_import_file)
+    assert jbeam_editor_test.export_jbeam_to_file() == {'FINISHED'}
+    assert jbeam_editor_test.export_jbeam_to_file() == {'FINISHED'}
+    new_stat = os.stat(jbeam_editor_test.temp_import_file)
+    assert (new_stat.st_ino, new_stat.st_mtime_ns) == (stat.st_ino, stat.st_mtime_ns)
+
+    assert not os.path.exists(jbeam_editor_test.temp_import_file + '.tmp')
+    assert jbeam_editor_test.test_result()
+    jbeam_editor_test.cleanup()
+
+
+# Import, choose JBeam mesh, export to disk, edit other part of JBeam file outside of Blender (same size and modification time), move node nl10, export (valid, edit kept)
+def test_3():
+    jbeam_editor_test.set_test_to_run(test_3.__name__)
+    jbeam_filepath = jbeam_editor_test.temp_import_file
+
+    # Import chosen part from JBeam file
+    jbeam_editor_test.import_jbeam()
+    jbeam_editor_test.select_imported_jbeam_mesh()
+
+    # Export JBeam file, which parses the file on disk once
+    assert jbeam_editor_test.export_jbeam_to_file() == {'FINISHED'}
+    assert jbeam_filepath in export_jbeam._disk_ast_nodes_cache
+
+    # Edit the file like another program would, without changing its size or modification time
+    stat = os.stat(jbeam_filepath)
+    with open(jbeam_filepath, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    with open(jbeam_filepath, 'w', encoding='utf-8', newline='') as f:
+        f.write(text.replace('"Square Donut Extra"', '"Square Donut Edits"'))
+    os.utime(jbeam_filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    # Move node(s) to new position
+    jbeam_editor_test.move_nodes_from_imported_jbeam_mesh({'nl10': (-0.84,  0.99, 10)})
+
+    # Export JBeam file and test result
+    assert jbeam_editor_test.export_jbeam_to_file() == {'FINISHED'}
+    assert jbeam_editor_test.test_result()
+    jbeam_editor_test.cleanup()
+
+
+# Import, choose JBeam mesh with an empty table schema memo, import again (memo hits), import again with a memo that only fits two tables (evictions), export (valid)
+def test_4(monkeypatch):
+    jbeam_editor_test.set_test_to_run(test_4.__name__)
+    chosen_part = jbeam_editor_test.import_part
+
+    def import_part_data():
+        jbeam_editor_test.import_jbeam()
+        assert chosen_part in bpy.context.scene.objects
+        return bpy.context.scene.objects[chosen_part].data[constants.MESH_SINGLE_JBEAM_PART_DATA]
+
+    table_schema.memo.clear()
+    part_data = import_part_data()
+    assert len(table_schema.memo) > 0
+    jbeam_editor_test.cleanup()
+
+    # Results from the memo are the same as freshly processed ones
+    assert import_part_data() == part_data
+    jbeam_editor_test.cleanup()
+
+    # Least recently used tables are dropped from the memo once it's full
+    monkeypatch.setattr(table_schema, 'MEMO_MAX_SIZE', 2)
+    table_schema.memo.clear()
+    assert import_part_data() == part_data
+    assert len(table_schema.memo) <= 2
+
+    # Export JBeam file and test result
+    jbeam_editor_test.select_imported_jbeam_mesh()
+    assert jbeam_editor_test.export_jbeam_to_file() == {'FINISHED'}
+    assert jbeam_editor_test.test_result()
+    jbeam_editor_test.cleanup()